@@ -1,51 +1,193 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_file
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, insert, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload, raiseload
 from werkzeug.utils import secure_filename
 import os
-import pandas as pd
+import logging
+import re
+import asyncio
+import threading
+import random
+import functools
+import time
+from contextlib import asynccontextmanager
 import sqlite3
+import codecs
+import csv
+import io
 import json
-from datetime import datetime
-import openai
+import hashlib
+import orjson
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
 from dotenv import load_dotenv
 import config
 import markdown
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
 
 # Load environment variables
 load_dotenv()
 
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+                    format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///govcon_ai_assessments.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_size': 5, 'pool_pre_ping': True}
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Ensure upload folder exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
 # Initialize database
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling and faster sync/cache settings for SQLite connections"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-64000')  # 64MB
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256MB
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
 # Configure OpenAI
-openai.api_key = os.getenv('OPENAI_API_KEY')
+# All OpenAI calls run on one long-lived event loop in a background thread so the
+# async client (and its connection pool) is shared across requests
+ai_loop = asyncio.new_event_loop()
+threading.Thread(target=ai_loop.run_forever, name='openai-loop', daemon=True).start()
+_openai_client = None
+
+# OpenAI rate limits (requests and tokens per minute) and concurrency cap
+OPENAI_RPM = int(os.getenv('OPENAI_RPM', '500'))
+OPENAI_TPM = int(os.getenv('OPENAI_TPM', '200000'))
+OPENAI_MAX_CONCURRENT = int(os.getenv('OPENAI_MAX_CONCURRENT', '8'))
+OPENAI_MAX_RETRIES = 3
+
+# Errors worth retrying: rate limits, timeouts/connection failures (APITimeoutError is an
+# APIConnectionError) and 5xx responses
+OPENAI_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Keep connections alive across the bursts of concurrent section requests
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+OPENAI_TIMEOUT = httpx.Timeout(60.0, connect=10.0)  # Get-Well Plans can take a while to generate
+
+def get_openai_client():
+    """Get the shared AsyncOpenAI client (created lazily on the AI event loop)"""
+    global _openai_client
+    if _openai_client is None:
+        # Retries (rate limits, timeouts, connection and 5xx errors) are handled by create_chat_completion
+        _openai_client = AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            max_retries=0,
+            timeout=OPENAI_TIMEOUT,
+            http_client=httpx.AsyncClient(limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_TIMEOUT)
+        )
+    return _openai_client
+
+def run_async(coro):
+    """Run a coroutine on the AI event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, ai_loop).result()
+
+class OpenAIThrottler:
+    """Caps concurrent OpenAI calls and keeps them within the RPM/TPM budget"""
+    
+    def __init__(self, max_concurrent, rpm, tpm):
+        self.max_concurrent = max_concurrent
+        self.semaphore = None  # Created on the AI event loop by limit()
+        self.rpm = rpm
+        self.tpm = tpm
+        self.request_times = deque()
+        self.window_start = time.monotonic()
+        self.window_tokens = 0
+    
+    async def _wait_for_capacity(self, tokens):
+        while True:
+            now = time.monotonic()
+            
+            # Drop requests older than a minute and reset the token window each minute
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+            if now - self.window_start >= 60:
+                self.window_start = now
+                self.window_tokens = 0
+            
+            if len(self.request_times) >= self.rpm:
+                delay = 60 - (now - self.request_times[0])
+            elif self.window_tokens and self.window_tokens + tokens > self.tpm:
+                delay = 60 - (now - self.window_start)
+            else:
+                self.request_times.append(now)
+                self.window_tokens += tokens
+                return
+            
+            await asyncio.sleep(delay)
+    
+    @asynccontextmanager
+    async def limit(self, tokens):
+        """Hold a concurrency slot for a request expected to use `tokens` tokens"""
+        # Before Python 3.10 a semaphore binds to the loop current where it is created,
+        # so create it here on ai_loop rather than at import on the main thread
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self.semaphore:
+            await self._wait_for_capacity(tokens)
+            yield
+
+openai_throttler = OpenAIThrottler(OPENAI_MAX_CONCURRENT, OPENAI_RPM, OPENAI_TPM)
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token estimate for a chat request (~4 characters per token)"""
+    prompt_tokens = sum(len(m['content']) for m in messages) // 4
+    return prompt_tokens + (max_tokens or 500)
+
+async def create_chat_completion(**kwargs):
+    """Create a chat completion through the throttler, backing off on rate limits and transient errors"""
+    tokens = estimate_tokens(kwargs['messages'], kwargs.get('max_tokens'))
+    
+    for attempt in range(OPENAI_MAX_RETRIES + 1):
+        try:
+            async with openai_throttler.limit(tokens):
+                return await get_openai_client().chat.completions.create(**kwargs)
+        except OPENAI_RETRYABLE_ERRORS as e:
+            if attempt == OPENAI_MAX_RETRIES:
+                raise
+            delay = min(60, 2 ** attempt + random.random())
+            logger.warning("OpenAI request failed (%s), retrying in %.1fs...", type(e).__name__, delay)
+            await asyncio.sleep(delay)
+
+@functools.lru_cache(maxsize=512)
+def render_markdown(text):
+    """Convert markdown text to HTML (cached, plans only change when regenerated)"""
+    if not text:
+        return ''
+    return markdown.markdown(text, extensions=['nl2br', 'fenced_code'])
 
 # Add custom Jinja2 filter for markdown conversion
 @app.template_filter('markdown')
 def markdown_filter(text):
     """Convert markdown text to HTML"""
-    if not text:
-        return ''
-    return markdown.markdown(text, extensions=['nl2br', 'fenced_code'])
+    return render_markdown(text)
 
 # Add markdown function to template context
 @app.context_processor
 def utility_processor():
-    def markdown_to_html(text):
-        if not text:
-            return ''
-        return markdown.markdown(text, extensions=['nl2br', 'fenced_code'])
-    return dict(markdown_to_html=markdown_to_html)
+    return dict(markdown_to_html=render_markdown)
 
 # Database Models
 class Company(db.Model):
@@ -71,6 +213,8 @@ class Assessment(db.Model):
     score = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_assessment_company_section', 'company_id', 'section'),)
 
 class GetWellPlan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -79,14 +223,53 @@ class GetWellPlan(db.Model):
     plan_text = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_getwell_plan_company_section', 'company_id', 'section'),)
+
+class AIResultCache(db.Model):
+    key = db.Column(db.String(32), primary_key=True)  # Hash of model, prompts, section, responses and company type
+    score = db.Column(db.Float)
+    plan_text = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CalculationJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
+    state = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed, superseded
+    progress = db.Column(db.Integer, nullable=False, default=0)  # Percent complete
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+# Jobs that have not reported progress for this long are treated as dead
+CALCULATION_JOB_TIMEOUT = timedelta(minutes=int(os.getenv('CALCULATION_JOB_TIMEOUT_MINUTES', '15')))
 
 # Create database tables
 with app.app_context():
     db.create_all()
+    
+    # create_all() skips indexes on tables that already exist, so add them to older databases
+    for table in (Assessment.__table__, GetWellPlan.__table__):
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    
+    # Close out jobs left queued or running by a dead process; only stale ones, since other
+    # worker processes may still be running recent jobs
+    interrupted_jobs = CalculationJob.query.filter(
+        CalculationJob.state.in_(['queued', 'running']),
+        CalculationJob.updated_at < datetime.utcnow() - CALCULATION_JOB_TIMEOUT
+    ).update({'state': 'failed', 'message': 'Interrupted before it finished'}, synchronize_session=False)
+    db.session.commit()
+    if interrupted_jobs:
+        logger.warning("Marked %d interrupted calculation jobs as failed", interrupted_jobs)
 
 def get_section_score(company_id, section):
     """Calculate average score for a section"""
     assessments = Assessment.query.filter_by(company_id=company_id, section=section).all()
+    return average_assessment_score(assessments)
+
+def average_assessment_score(assessments):
+    """Average the scores of already-loaded assessments (None if none are scored)"""
     scored_assessments = [a for a in assessments if a.score is not None]
     
     if not scored_assessments:
@@ -94,12 +277,15 @@ def get_section_score(company_id, section):
     
     return sum(a.score for a in scored_assessments) / len(scored_assessments)
 
-def get_company_sections(company_id):
+def get_section_scores(company_id):
+    """Calculate average score for every section of a company in one query"""
+    return dict(db.session.query(Assessment.section, func.avg(Assessment.score))
+                .filter_by(company_id=company_id)
+                .group_by(Assessment.section)
+                .all())
+
+def get_company_sections(company):
     """Get the appropriate sections for a company based on its type"""
-    company = Company.query.get(company_id)
-    if not company:
-        return []
-    
     base_sections = [
         'Section 1: Company Profile & Strategic Alignment',
         'Section 2: AI Capabilities & Technical Maturity',
@@ -121,15 +307,16 @@ def get_company_sections(company_id):
     
     return base_sections
 
-def get_overall_score(company_id):
+def get_overall_score(company, section_scores=None):
     """Calculate overall score for a company (excluding Future Readiness)"""
-    sections = get_company_sections(company_id)
+    sections = get_company_sections(company)
     
-    section_scores = []
-    for section in sections:
-        score = get_section_score(company_id, section)
-        if score is not None:
-            section_scores.append(score)
+    # Callers may pass precomputed {section: average score} to skip per-section queries
+    if section_scores is None:
+        section_scores = get_section_scores(company.id)
+    
+    section_scores = [section_scores[section] for section in sections
+                      if section_scores.get(section) is not None]
     
     if not section_scores:
         return None
@@ -147,90 +334,159 @@ def get_score_color(score):
     else:
         return 'green'
 
-def generate_ai_score(section, responses):
+# Section name -> prompt config lookup tables
+SECTION_SCORE_PROMPTS = {
+    'Section 1: Company Profile & Strategic Alignment': config.SECTION_1_PROMPT,
+    'Section 2: AI Capabilities & Technical Maturity': config.SECTION_2_PROMPT,
+    'Section 3: Government AI Integration & Contract Performance': config.SECTION_3_GOVCON_PROMPT,
+    'Section 3: AI Adoption & Compliance in Healthcare Settings': config.SECTION_3_HEALTHCARE_PROMPT,
+    'Section 3: AI Integration & Financial Services Delivery': config.SECTION_3_FINANCE_PROMPT,
+    'Section 4: Partnerships, Ecosystem & Industry Engagement': config.SECTION_4_PROMPT,
+    'Section 5: AI Talent, Culture & Organizational Readiness': config.SECTION_5_PROMPT,
+    'Section 6: Future Readiness & Differentiators': config.SECTION_6_PROMPT
+}
+
+SECTION_GETWELL_PROMPTS = {
+    'Section 1: Company Profile & Strategic Alignment': config.GETWELL_SECTION_1_PROMPT,
+    'Section 2: AI Capabilities & Technical Maturity': config.GETWELL_SECTION_2_PROMPT,
+    'Section 3: Government AI Integration & Contract Performance': config.GETWELL_SECTION_3_GOVCON_PROMPT,
+    'Section 3: AI Adoption & Compliance in Healthcare Settings': config.GETWELL_SECTION_3_HEALTHCARE_PROMPT,
+    'Section 3: AI Integration & Financial Services Delivery': config.GETWELL_SECTION_3_FINANCE_PROMPT,
+    'Section 4: Partnerships, Ecosystem & Industry Engagement': config.GETWELL_SECTION_4_PROMPT,
+    'Section 5: AI Talent, Culture & Organizational Readiness': config.GETWELL_SECTION_5_PROMPT,
+    'Section 6: Future Readiness & Differentiators': config.GETWELL_SECTION_6_PROMPT
+}
+
+# {{placeholder}} markers in config prompts
+PROMPT_PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+
+def fill_prompt(template, **values):
+    """Substitute {{placeholder}} markers in a prompt template in a single pass"""
+    return PROMPT_PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), template)
+
+# Longest answer text sent to OpenAI, and the output budget per section score
+MAX_ANSWER_CHARS = 600
+SCORE_MAX_TOKENS = 80
+
+# Minimum answered questions in a section before it is scored (fewer leaves it unscored)
+MIN_RESPONSES_FOR_SCORING = 2
+
+def format_responses(responses):
+    """Format (question, answer) pairs for a prompt, truncating long answers"""
+    return "\n".join(f"Q: {q}\nA: {a[:MAX_ANSWER_CHARS]}" for q, a in responses)
+
+def normalize_score(value):
+    """Coerce a model-provided score to an integer between 1 and 10 (None if invalid)"""
+    try:
+        return max(1, min(10, int(value)))  # Ensure score is between 1-10
+    except (TypeError, ValueError):
+        return None
+
+# Leading "score" field of a JSON score response, found even if the output was cut off
+SCORE_FIELD_RE = re.compile(r'"score"\s*:\s*"?(\d+)')
+
+def parse_score_response(choice):
+    """Read the score from a JSON-mode completion choice (salvaging it if output hit max_tokens)"""
+    if choice.finish_reason == 'length':
+        # The config prompts ask for a justification, which can overrun SCORE_MAX_TOKENS
+        # and leave invalid JSON; the score comes first, so it is usually still there
+        match = SCORE_FIELD_RE.search(choice.message.content or '')
+        return normalize_score(match.group(1)) if match else None
+    
+    return normalize_score(orjson.loads(choice.message.content).get('score'))
+
+def build_score_prompt(section, responses):
+    """Build the scoring prompt for a section (None if the section has no prompt)"""
+    prompt_config = SECTION_SCORE_PROMPTS.get(section)
+    if not prompt_config:
+        return None
+    
+    return fill_prompt(prompt_config['prompt'], responses=format_responses(responses))
+
+async def generate_ai_score(section, responses):
     """Generate AI score using OpenAI"""
     try:
-        # Get the appropriate prompt from config
-        section_prompts = {
-            'Section 1: Company Profile & Strategic Alignment': config.SECTION_1_PROMPT,
-            'Section 2: AI Capabilities & Technical Maturity': config.SECTION_2_PROMPT,
-            'Section 3: Government AI Integration & Contract Performance': config.SECTION_3_GOVCON_PROMPT,
-            'Section 3: AI Adoption & Compliance in Healthcare Settings': config.SECTION_3_HEALTHCARE_PROMPT,
-            'Section 3: AI Integration & Financial Services Delivery': config.SECTION_3_FINANCE_PROMPT,
-            'Section 4: Partnerships, Ecosystem & Industry Engagement': config.SECTION_4_PROMPT,
-            'Section 5: AI Talent, Culture & Organizational Readiness': config.SECTION_5_PROMPT,
-            'Section 6: Future Readiness & Differentiators': config.SECTION_6_PROMPT
-        }
-        
-        prompt_config = section_prompts.get(section)
-        if not prompt_config:
+        prompt = build_score_prompt(section, responses)
+        if not prompt:
             return None
         
-        # Format responses for the prompt
-        formatted_responses = "\n".join([f"Q: {q}\nA: {a}" for q, a in responses])
-        prompt = prompt_config['prompt'].replace('{{responses}}', formatted_responses)
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
+        response = await create_chat_completion(
+            model=OPENAI_MODEL,
             messages=[
-                {"role": "system", "content": "You are an AI assessment expert. Provide only a JSON response with 'score' (integer 1-10) and 'justification' (string)."},
+                {"role": "system", "content": "You are an AI assessment expert. Provide only a JSON response with 'score' (integer 1-10). Do not include a justification."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.3
+            temperature=0.3,
+            max_tokens=SCORE_MAX_TOKENS,
+            response_format={"type": "json_object"}
         )
         
-        # Parse the response
-        content = response.choices[0].message.content
-        try:
-            # Try to extract JSON from the response
-            if '{' in content and '}' in content:
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                json_str = content[json_start:json_end]
-                result = json.loads(json_str)
-                return result.get('score')
-        except:
-            # If JSON parsing fails, try to extract score from text
-            import re
-            score_match = re.search(r'\b(\d+)\b', content)
-            if score_match:
-                score = int(score_match.group(1))
-                return max(1, min(10, score))  # Ensure score is between 1-10
-        
-        return None
+        return parse_score_response(response.choices[0])
     except Exception as e:
-        print(f"Error generating AI score: {e}")
+        logger.error("Error generating AI score: %s", e)
         return None
 
-def generate_ai_getwell_plan(section, responses, score, company_type):
+async def generate_ai_scores(section_responses):
+    """Score several sections in one OpenAI request, falling back to one request per section"""
+    tasks = []
+    for section, responses in section_responses.items():
+        prompt = build_score_prompt(section, responses)
+        if prompt:
+            tasks.append({'section': section, 'prompt': prompt})
+    
+    scores = {}
+    if len(tasks) > 1:
+        try:
+            response = await create_chat_completion(
+                model=OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": "You are an AI assessment expert. You will receive a JSON array of assessment tasks, each with a 'section' name and its evaluation 'prompt'. Evaluate each task independently. Provide only a JSON response mapping each section name to an object with 'score' (integer 1-10). Do not include justifications."},
+                    {"role": "user", "content": json.dumps(tasks)}
+                ],
+                temperature=0.3,
+                max_tokens=SCORE_MAX_TOKENS * len(tasks),
+                response_format={"type": "json_object"}
+            )
+            
+            choice = response.choices[0]
+            if choice.finish_reason == 'length':
+                # Truncated JSON can't be parsed; every section falls back to its own request
+                raise ValueError("batched scores were cut off at max_tokens")
+            
+            result = orjson.loads(choice.message.content)
+            for task in tasks:
+                section_result = result.get(task['section'])
+                if isinstance(section_result, dict):
+                    score = normalize_score(section_result.get('score'))
+                    if score is not None:
+                        scores[task['section']] = score
+        except Exception as e:
+            logger.error("Error generating batched AI scores: %s", e)
+    
+    # Score anything the batch missed or returned invalid results for individually
+    missing = [section for section in section_responses if section not in scores]
+    missing_scores = await asyncio.gather(*[
+        generate_ai_score(section, section_responses[section]) for section in missing
+    ])
+    scores.update({section: score for section, score in zip(missing, missing_scores) if score is not None})
+    
+    return scores
+
+async def generate_ai_getwell_plan(section, responses, score, company_type):
     """Generate AI Get-Well Plan using OpenAI"""
     try:
-        # Get the appropriate prompt from config
-        getwell_prompts = {
-            'Section 1: Company Profile & Strategic Alignment': config.GETWELL_SECTION_1_PROMPT,
-            'Section 2: AI Capabilities & Technical Maturity': config.GETWELL_SECTION_2_PROMPT,
-            'Section 3: Government AI Integration & Contract Performance': config.GETWELL_SECTION_3_GOVCON_PROMPT,
-            'Section 3: AI Adoption & Compliance in Healthcare Settings': config.GETWELL_SECTION_3_HEALTHCARE_PROMPT,
-            'Section 3: AI Integration & Financial Services Delivery': config.GETWELL_SECTION_3_FINANCE_PROMPT,
-            'Section 4: Partnerships, Ecosystem & Industry Engagement': config.GETWELL_SECTION_4_PROMPT,
-            'Section 5: AI Talent, Culture & Organizational Readiness': config.GETWELL_SECTION_5_PROMPT,
-            'Section 6: Future Readiness & Differentiators': config.GETWELL_SECTION_6_PROMPT
-        }
-        
-        prompt_config = getwell_prompts.get(section)
+        prompt_config = SECTION_GETWELL_PROMPTS.get(section)
         if not prompt_config:
             return None
         
-        # Format responses for the prompt
-        formatted_responses = "\n".join([f"Q: {q}\nA: {a}" for q, a in responses])
-        
         # Replace placeholders in the prompt
-        prompt = prompt_config['prompt'].replace('{{responses}}', formatted_responses)
-        prompt = prompt.replace('{{score}}', str(score))
-        prompt = prompt.replace('{{company_type}}', company_type or 'Unknown')
+        prompt = fill_prompt(prompt_config['prompt'],
+                             responses=format_responses(responses),
+                             score=str(score),
+                             company_type=company_type or 'Unknown')
         
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
+        response = await create_chat_completion(
+            model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "You are an expert AI consultant specializing in strategic planning and organizational development. Provide comprehensive, actionable Get-Well Plans with specific recommendations, timelines, and success metrics."},
                 {"role": "user", "content": prompt}
@@ -243,22 +499,97 @@ def generate_ai_getwell_plan(section, responses, score, company_type):
         return response.choices[0].message.content.strip()
         
     except Exception as e:
-        print(f"Error generating AI Get-Well Plan: {e}")
+        logger.error("Error generating AI Get-Well Plan: %s", e)
         return None
 
-def calculate_all_section_scores(company_id):
-    """Calculate AI scores for all sections of a company (excluding Future Readiness)"""
-    sections = get_company_sections(company_id)
+async def generate_section_results(section_responses, company_type):
+    """Score all sections in one batch, then generate their Get-Well Plans concurrently"""
+    scores = await generate_ai_scores(section_responses)
+    scored = [(section, scores[section]) for section in section_responses if section in scores]
+    plans = await asyncio.gather(*[
+        generate_ai_getwell_plan(section, section_responses[section], score, company_type)
+        for section, score in scored
+    ])
+    return {section: (score, plan) for (section, score), plan in zip(scored, plans)}
+
+# Bump when the system prompts or response parsing change so cached results are regenerated
+AI_CACHE_VERSION = 2
+AI_CACHE_TTL = timedelta(days=int(os.getenv('AI_CACHE_TTL_DAYS', '30')))
+
+def get_ai_cache_key(section, responses, company_type):
+    """Hash the inputs that determine a section's AI score and Get-Well Plan"""
+    # Include the model and prompt templates so editing config.py invalidates old results
+    payload = json.dumps([
+        AI_CACHE_VERSION, OPENAI_MODEL,
+        SECTION_SCORE_PROMPTS.get(section, {}).get('prompt'),
+        SECTION_GETWELL_PROMPTS.get(section, {}).get('prompt'),
+        section, sorted(responses), company_type
+    ])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+def get_section_results(section_responses, company_type, force=False):
+    """Get (score, Get-Well Plan) per section, only calling OpenAI for responses not seen before (or all, with `force`)"""
+    keys = {section: get_ai_cache_key(section, responses, company_type)
+            for section, responses in section_responses.items()}
+    cutoff = datetime.utcnow() - AI_CACHE_TTL
+    cached = {} if force else {
+        entry.key: entry for entry in AIResultCache.query.filter(AIResultCache.key.in_(keys.values()),
+                                                                 AIResultCache.created_at >= cutoff)
+    }
+    
+    results = {}
+    uncached = {}
+    for section, key in keys.items():
+        if key in cached:
+            results[section] = (cached[key].score, cached[key].plan_text)
+        else:
+            uncached[section] = section_responses[section]
+    
+    if uncached:
+        generated = run_async(generate_section_results(uncached, company_type))
+        for section, (score, getwell_plan) in generated.items():
+            results[section] = (score, getwell_plan)
+            # Only cache complete results so a failed plan is retried next time
+            if getwell_plan:
+                db.session.merge(AIResultCache(key=keys[section], score=score, plan_text=getwell_plan,
+                                               created_at=datetime.utcnow()))
+        
+        # Evict expired entries while we are writing anyway
+        AIResultCache.query.filter(AIResultCache.created_at < cutoff).delete(synchronize_session=False)
     
-    # Get company information for Get-Well Plan generation
+    if len(uncached) < len(keys):
+        logger.info("Reused cached AI results for %d of %d sections", len(keys) - len(uncached), len(keys))
+    
+    return results
+
+def set_job_progress(job, progress):
+    """Record progress on a background calculation job, if there is one"""
+    if job is not None:
+        job.progress = progress
+        db.session.commit()
+
+def job_superseded(job):
+    """Check whether a newer calculation job has been queued for the same company"""
+    return db.session.query(
+        CalculationJob.query.filter(CalculationJob.company_id == job.company_id,
+                                    CalculationJob.id > job.id).exists()
+    ).scalar()
+
+def calculate_all_section_scores(company_id, job=None, force=False):
+    """Calculate AI scores for all sections of a company (None if `job` was superseded)"""
     company = Company.query.get(company_id)
-    company_type = company.company_type if company else None
+    if not company:
+        return {}
     
-    results = {}
+    sections = get_company_sections(company)
+    company_type = company.company_type
     
+    # Collect responses for every section up front so the AI calls can run concurrently;
+    # sections edited after this point are left to the edit's own re-scoring
+    read_at = datetime.utcnow()
+    section_responses = {}
+    unscorable_sections = []
     for section in sections:
-        print(f"Calculating score for {section}...")
-        
         # Get all assessments for this section
         assessments = Assessment.query.filter_by(company_id=company_id, section=section).all()
         
@@ -266,97 +597,218 @@ def calculate_all_section_scores(company_id):
         responses = [(a.question, a.answer) for a in assessments 
                     if a.answer and 'Get-Well Plan' not in a.question and a.answer.strip()]
         
-        if responses:
-            # Generate AI score
-            score = generate_ai_score(section, responses)
-            if score is not None:
-                # Update all assessments in this section with the new score
-                for a in assessments:
-                    if 'Get-Well Plan' not in a.question:
-                        a.score = score
-                
-                # Generate AI Get-Well Plan
-                print(f"  Generating Get-Well Plan for {section}...")
-                getwell_plan = generate_ai_getwell_plan(section, responses, score, company_type)
-                
-                if getwell_plan:
-                    # Update or create Get-Well Plan
-                    existing_plan = GetWellPlan.query.filter_by(
-                        company_id=company_id, 
-                        section=section
-                    ).first()
-                    
-                    if existing_plan:
-                        existing_plan.plan_text = getwell_plan
-                    else:
-                        new_plan = GetWellPlan(
-                            company_id=company_id,
-                            section=section,
-                            plan_text=getwell_plan
-                        )
-                        db.session.add(new_plan)
-                    
-                    print(f"  Get-Well Plan generated successfully")
-                else:
-                    print(f"  Failed to generate Get-Well Plan")
-                
-                results[section] = score
-                print(f"  Score: {score}/10")
+        if len(responses) >= MIN_RESPONSES_FOR_SCORING:
+            section_responses[section] = responses
+        else:
+            logger.info("Only %d answered questions in %s, skipping scoring", len(responses), section)
+            unscorable_sections.append(section)
+    
+    set_job_progress(job, 10)
+    logger.info("Calculating scores for %d sections...", len(section_responses))
+    section_results = get_section_results(section_responses, company_type, force)
+    
+    # Take SQLite's write lock before the checks below, so no upload or answer edit can
+    # land between them and the commit
+    if job is not None:
+        job.progress = 90
+        db.session.flush()
+        
+        # A newer job (e.g. from a fresh CSV upload) may have replaced the answers these
+        # results were computed from, so leave the saving to it
+        if job_superseded(job):
+            db.session.rollback()
+            logger.info("Calculation job %s was superseded, discarding its results", job.id)
+            return None
+    
+    # Don't overwrite scores and plans of sections whose answers were edited meanwhile
+    edited_sections = {section for (section,) in db.session.query(Assessment.section).filter(
+        Assessment.company_id == company_id,
+        Assessment.updated_at > read_at
+    ).distinct()}
+    if edited_sections:
+        logger.info("Skipping sections edited during the calculation: %s", ', '.join(sorted(edited_sections)))
+        unscorable_sections = [section for section in unscorable_sections if section not in edited_sections]
+    
+    results = {}
+    
+    # Clear scores left over from earlier answers in sections that can no longer be scored
+    if unscorable_sections:
+        db.session.execute(
+            update(Assessment)
+            .where(Assessment.company_id == company_id,
+                   Assessment.section.in_(unscorable_sections))
+            .values(score=None)
+            .execution_options(synchronize_session=False)
+        )
+    
+    for section in section_responses:
+        if section in edited_sections:
+            continue
+        if section not in section_results:
+            logger.warning("Failed to generate score for %s", section)
+            continue
+        
+        score, getwell_plan = section_results[section]
+        
+        # Update all assessments in this section with the new score in one statement; the
+        # loaded assessments were expired by the progress commits and are not reloaded
+        db.session.execute(
+            update(Assessment)
+            .where(Assessment.company_id == company_id,
+                   Assessment.section == section,
+                   ~Assessment.question.contains('Get-Well Plan'))
+            .values(score=score)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if getwell_plan:
+            # Update or create Get-Well Plan
+            existing_plan = GetWellPlan.query.filter_by(
+                company_id=company_id, 
+                section=section
+            ).first()
+            
+            if existing_plan:
+                existing_plan.plan_text = getwell_plan
             else:
-                print(f"  Failed to generate score")
+                new_plan = GetWellPlan(
+                    company_id=company_id,
+                    section=section,
+                    plan_text=getwell_plan
+                )
+                db.session.add(new_plan)
+            
+            logger.info("Get-Well Plan generated successfully for %s", section)
         else:
-            print(f"  No valid responses found")
+            logger.warning("Failed to generate Get-Well Plan for %s", section)
+        
+        results[section] = score
+        logger.info("%s score: %s/10", section, score)
     
     # Commit all changes
     db.session.commit()
     
     return results
 
+# Background score calculation
+calculation_executor = ThreadPoolExecutor(max_workers=int(os.getenv('CALCULATION_WORKERS', '2')),
+                                          thread_name_prefix='score-calculation')
+
+def get_active_job(company_id):
+    """Get the queued or running calculation job for a company, if any (ignoring stale jobs)"""
+    return (CalculationJob.query
+            .filter_by(company_id=company_id)
+            .filter(CalculationJob.state.in_(['queued', 'running']),
+                    CalculationJob.updated_at >= datetime.utcnow() - CALCULATION_JOB_TIMEOUT)
+            .order_by(CalculationJob.id.desc())
+            .first())
+
+def enqueue_score_calculation(company_id, force=False):
+    """Queue AI scoring for a company in the background and return its job"""
+    # A queued job will read the current answers when it starts, but a running one
+    # may already have read older ones and is superseded by a new job instead
+    job = get_active_job(company_id)
+    if job and job.state == 'queued' and not force:
+        return job
+    
+    job = CalculationJob(company_id=company_id)
+    db.session.add(job)
+    db.session.commit()
+    
+    calculation_executor.submit(run_calculation_job, job.id, force)
+    return job
+
+def run_calculation_job(job_id, force=False):
+    """Run a queued score calculation job (on a calculation_executor thread)"""
+    with app.app_context():
+        job = CalculationJob.query.get(job_id)
+        job.state = 'running'
+        db.session.commit()
+        
+        try:
+            results = calculate_all_section_scores(job.company_id, job, force)
+            if results is None:
+                job.message = 'Superseded by a newer score calculation'
+                job.state = 'superseded'
+            else:
+                if results:
+                    job.message = f'Successfully calculated AI scores for {len(results)} sections'
+                    job.state = 'done'
+                else:
+                    logger.warning("No scores calculated for company %s", job.company_id)
+                    job.message = 'No scores could be calculated. Check if you have an OpenAI API key set.'
+                    job.state = 'failed'
+        except Exception as e:
+            logger.exception("Failed to calculate scores for company %s", job.company_id)
+            db.session.rollback()
+            job.state = 'failed'
+            job.message = f'Error calculating scores: {str(e)}'
+        
+        job.progress = 100
+        db.session.commit()
+
 # Routes
 @app.route('/')
 def index():
     """Home page - Company Dashboard"""
     companies = Company.query.all()
     
-    print(f"DEBUG: Found {len(companies)} companies in database")
+    logger.debug("Found %d companies in database", len(companies))
+    
+    # Aggregate section scores and assessment counts for all companies at once
+    section_scores = {}
+    for company_id, section, avg_score in db.session.query(
+        Assessment.company_id, Assessment.section, func.avg(Assessment.score)
+    ).group_by(Assessment.company_id, Assessment.section).all():
+        section_scores.setdefault(company_id, {})[section] = avg_score
+    
+    assessment_counts = dict(db.session.query(
+        Assessment.company_id, func.count(Assessment.id)
+    ).group_by(Assessment.company_id).all())
     
-    # Calculate scores for each company
     for company in companies:
-        company.overall_score = get_overall_score(company.id)
+        company.overall_score = get_overall_score(company, section_scores.get(company.id, {}))
         company.score_color = get_score_color(company.overall_score)
+        company.assessment_count = assessment_counts.get(company.id, 0)
         
-        # Get assessment count for this company
-        assessment_count = Assessment.query.filter_by(company_id=company.id).count()
-        company.assessment_count = assessment_count
-        
-        print(f"DEBUG: {company.name} - Score: {company.overall_score}, Color: {company.score_color}, Assessments: {assessment_count}")
+        logger.debug("%s - Score: %s, Color: %s, Assessments: %s",
+                     company.name, company.overall_score, company.score_color, company.assessment_count)
     
-    print(f"DEBUG: Passing {len(companies)} companies to template")
+    logger.debug("Passing %d companies to template", len(companies))
     return render_template('index.html', companies=companies)
 
 @app.route('/company/<int:company_id>')
 def company_detail(company_id):
     """Detailed company assessment page"""
-    company = Company.query.get_or_404(company_id)
-    sections = get_company_sections(company_id) + ['Section 6: Future Readiness & Differentiators']
+    # Load assessments and plans with the company; raise on any other lazy load
+    company = Company.query.options(
+        selectinload(Company.assessments),
+        selectinload(Company.getwell_plans),
+        raiseload('*')
+    ).get_or_404(company_id)
+    sections = get_company_sections(company) + ['Section 6: Future Readiness & Differentiators']
+    
+    # Group assessments by section
+    assessments_by_section = defaultdict(list)
+    for assessment in company.assessments:
+        assessments_by_section[assessment.section].append(assessment)
+    
+    section_scores = get_section_scores(company_id)
     
-    # Get assessments for each section
     section_data = {}
     for section in sections:
-        assessments = Assessment.query.filter_by(company_id=company_id, section=section).all()
-        section_score = get_section_score(company_id, section)
+        section_score = section_scores.get(section)
         section_data[section] = {
-            'assessments': assessments,
+            'assessments': assessments_by_section[section],
             'score': section_score,
             'color': get_score_color(section_score)
         }
     
     # Get Get-Well Plans
-    getwell_plans = GetWellPlan.query.filter_by(company_id=company_id).all()
-    getwell_plans_dict = {plan.section: plan for plan in getwell_plans}
+    getwell_plans_dict = {plan.section: plan for plan in company.getwell_plans}
     
     # Get overall score
-    overall_score = get_overall_score(company_id)
+    overall_score = get_overall_score(company, section_scores)
     
     return render_template('company_detail.html', 
                          company=company, 
@@ -364,7 +816,8 @@ def company_detail(company_id):
                          section_data=section_data,
                          getwell_plans_dict=getwell_plans_dict,
                          overall_score=overall_score,
-                         overall_color=get_score_color(overall_score))
+                         overall_color=get_score_color(overall_score),
+                         active_job=get_active_job(company_id))
 
 @app.route('/api/update_assessment', methods=['POST'])
 def update_assessment():
@@ -374,8 +827,13 @@ def update_assessment():
     answer = data.get('answer')
     
     assessment = Assessment.query.get_or_404(assessment_id)
+    answer_unchanged = (assessment.answer or '').strip() == (answer or '').strip()
     assessment.answer = answer
     
+    # Save the answer now so SQLite's write lock is not held across the OpenAI calls below;
+    # the new score and Get-Well Plan are written in a second, short transaction
+    db.session.commit()
+    
     # Get all responses for this section to generate AI score
     section_assessments = Assessment.query.filter_by(
         company_id=assessment.company_id, 
@@ -386,22 +844,28 @@ def update_assessment():
     responses = [(a.question, a.answer) for a in section_assessments 
                 if a.answer and 'Get-Well Plan' not in a.question and a.answer.strip()]
     
-    if responses:
-        # Generate new AI score for this section
-        new_score = generate_ai_score(assessment.section, responses)
-        if new_score is not None:
+    # Leave the section unscored while too few questions are answered, and keep the current
+    # score if the answer did not meaningfully change (unless the section needs its first score)
+    section_scored = any(a.score is not None for a in section_assessments)
+    if len(responses) < MIN_RESPONSES_FOR_SCORING:
+        logger.info("Only %d answered questions in %s, clearing its score", len(responses), assessment.section)
+        for a in section_assessments:
+            a.score = None
+    elif answer_unchanged and section_scored:
+        logger.info("Answer unchanged, keeping current score for %s", assessment.section)
+    else:
+        # Generate new AI score and Get-Well Plan for this section (reused if responses are unchanged)
+        company_type = assessment.company.company_type
+        section_results = get_section_results({assessment.section: responses}, company_type)
+        
+        if assessment.section in section_results:
+            new_score, getwell_plan = section_results[assessment.section]
+            
             # Update all assessments in this section with the new score
             for a in section_assessments:
                 if 'Get-Well Plan' not in a.question:
                     a.score = new_score
             
-            # Generate new AI Get-Well Plan
-            company = Company.query.get(assessment.company_id)
-            company_type = company.company_type if company else None
-            
-            print(f"Generating Get-Well Plan for {assessment.section}...")
-            getwell_plan = generate_ai_getwell_plan(assessment.section, responses, new_score, company_type)
-            
             if getwell_plan:
                 # Update or create Get-Well Plan
                 existing_plan = GetWellPlan.query.filter_by(
@@ -419,19 +883,19 @@ def update_assessment():
                     )
                     db.session.add(new_plan)
                 
-                print(f"Get-Well Plan updated successfully")
+                logger.info("Get-Well Plan updated successfully for %s", assessment.section)
             else:
-                print(f"Failed to generate Get-Well Plan")
+                logger.warning("Failed to generate Get-Well Plan for %s", assessment.section)
             
-            print(f"Updated {assessment.section} score to {new_score}/10")
+            logger.info("Updated %s score to %s/10", assessment.section, new_score)
         else:
-            print(f"Failed to generate score for {assessment.section}")
+            logger.warning("Failed to generate score for %s", assessment.section)
     
     db.session.commit()
     
     # Return updated scores
     section_score = get_section_score(assessment.company_id, assessment.section)
-    overall_score = get_overall_score(assessment.company_id)
+    overall_score = get_overall_score(assessment.company)
     
     return jsonify({
         'section_score': section_score,
@@ -441,79 +905,66 @@ def update_assessment():
         'overall_color': get_score_color(overall_score)
     })
 
+# Generic AI answer text that shows up as the company name in synthetic data
+SYNTHETIC_NAME_RE = re.compile('|'.join(map(re.escape, [
+    'Our internal R&D team',
+    'We partner with AWS',
+    'Minimal progress on model management',
+    'We lack structured AI governance',
+    'We plan to double our AI staff',
+    'We are actively expanding'
+])))
+
 @app.route('/upload_csv', methods=['GET', 'POST'])
 def upload_csv():
     """Upload CSV file to populate assessments"""
     if request.method == 'POST':
-        print(f"DEBUG: Request files: {request.files}")
-        print(f"DEBUG: Request form: {request.form}")
+        logger.debug("Request files: %s", request.files)
+        logger.debug("Request form: %s", request.form)
         
         if 'file' not in request.files:
             flash('No file selected', 'error')
             return redirect(request.url)
         
         file = request.files['file']
-        print(f"DEBUG: File object: {file}")
-        print(f"DEBUG: File filename: {file.filename}")
+        logger.debug("File object: %s", file)
+        logger.debug("File filename: %s", file.filename)
         
         if file.filename == '':
             flash('No file selected', 'error')
             return redirect(request.url)
         
         if file and file.filename.endswith('.csv'):
+            # Only used to derive a company name for synthetic data
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
             
             try:
-                # Process the CSV file
-                df = pd.read_csv(filepath)
+                # Process the CSV file straight from the upload stream
+                # (decoded line by line; io.TextIOWrapper can't wrap the SpooledTemporaryFile
+                # Werkzeug uses for larger uploads before Python 3.11)
+                rows = list(csv.DictReader(codecs.iterdecode(file.stream, 'utf-8-sig')))
+                
+                # Map each question to its answer in one pass (first occurrence wins)
+                meta = {row['Question']: row['Answer'] for row in reversed(rows)}
                 
                 # Extract company name
-                company_name_row = df[df['Question'] == 'Company Name']
-                if company_name_row.empty:
+                if 'Company Name' not in meta:
                     flash('Company Name not found in CSV', 'error')
                     return redirect(request.url)
                 
-                company_name = company_name_row.iloc[0]['Answer']
+                company_name = meta['Company Name']
                 
                 # Extract company profile information
-                annual_revenue = None
-                employee_count = None
-                company_type = None
-                naics_codes = None
-                
-                revenue_row = df[df['Question'] == 'Revenue']
-                if not revenue_row.empty:
-                    annual_revenue = revenue_row.iloc[0]['Answer']
-                
-                employees_row = df[df['Question'] == 'Number of Employees']
-                if not employees_row.empty:
-                    employee_count = employees_row.iloc[0]['Answer']
+                annual_revenue = meta.get('Revenue')
+                employee_count = meta.get('Number of Employees')
+                naics_codes = meta.get('Primary NAICS Codes (Only GovCon)')
                 
                 # Handle both old and new Company Type question formats
-                company_type_row = df[df['Question'] == 'Company Type: GovCon Healthcare Finance or Industrial']
-                if company_type_row.empty:
-                    company_type_row = df[df['Question'] == 'Company Type: Basic, Financial Transaction Services, Healthcare, Technology & Government']
-                
-                if not company_type_row.empty:
-                    company_type = company_type_row.iloc[0]['Answer']
-                
-                naics_row = df[df['Question'] == 'Primary NAICS Codes (Only GovCon)']
-                if not naics_row.empty:
-                    naics_codes = naics_row.iloc[0]['Answer']
+                company_type = meta.get('Company Type: GovCon Healthcare Finance or Industrial',
+                                        meta.get('Company Type: Basic, Financial Transaction Services, Healthcare, Technology & Government'))
                 
                 # Check if the company name looks like synthetic data (contains generic AI text)
-                synthetic_indicators = [
-                    'Our internal R&D team',
-                    'We partner with AWS',
-                    'Minimal progress on model management',
-                    'We lack structured AI governance',
-                    'We plan to double our AI staff',
-                    'We are actively expanding'
-                ]
-                
-                is_synthetic = any(indicator in company_name for indicator in synthetic_indicators)
+                is_synthetic = SYNTHETIC_NAME_RE.search(company_name) is not None
                 
                 if is_synthetic:
                     # Generate company name from filename
@@ -524,7 +975,7 @@ def upload_csv():
                     else:
                         company_name = base_filename.replace('_', ' ').title()
                     
-                    print(f"DEBUG: Generated company name '{company_name}' from filename '{filename}'")
+                    logger.debug("Generated company name '%s' from filename '%s'", company_name, filename)
                 
                 # Check if company already exists
                 company = Company.query.filter_by(name=company_name).first()
@@ -555,43 +1006,36 @@ def upload_csv():
                 Assessment.query.filter_by(company_id=company.id).delete()
                 GetWellPlan.query.filter_by(company_id=company.id).delete()
                 
-                # Insert new assessments
-                for _, row in df.iterrows():
+                # Split rows into Get-Well Plans and regular assessments
+                assessment_rows = []
+                plan_rows = []
+                for row in rows:
                     if 'Get-Well Plan' in row['Question']:
-                        # Handle Get-Well Plan
-                        getwell_plan = GetWellPlan(
-                            company_id=company.id,
-                            section=row['Section'],
-                            plan_text=row['Answer']
-                        )
-                        db.session.add(getwell_plan)
+                        plan_rows.append({
+                            'company_id': company.id,
+                            'section': row['Section'],
+                            'plan_text': row['Answer']
+                        })
                     else:
-                        # Handle regular assessment
-                        assessment = Assessment(
-                            company_id=company.id,
-                            section=row['Section'],
-                            question=row['Question'],
-                            answer=row['Answer']
-                        )
-                        db.session.add(assessment)
+                        assessment_rows.append({
+                            'company_id': company.id,
+                            'section': row['Section'],
+                            'question': row['Question'],
+                            'answer': row['Answer']
+                        })
                 
-                db.session.commit()
+                # Insert new assessments and plans with one executemany each (Core, no ORM objects)
+                if assessment_rows:
+                    db.session.execute(insert(Assessment.__table__), assessment_rows)
+                if plan_rows:
+                    db.session.execute(insert(GetWellPlan.__table__), plan_rows)
                 
-                # Clean up uploaded file
-                os.remove(filepath)
+                db.session.commit()
                 
-                # Automatically calculate AI scores for all sections
-                try:
-                    print(f"Automatically calculating scores for {company_name}...")
-                    results = calculate_all_section_scores(company.id)
-                    if results:
-                        flash(f'Successfully uploaded data for {company_name} and calculated AI scores for {len(results)} sections', 'success')
-                    else:
-                        print(f"WARNING: No scores calculated for {company_name}. Results: {results}")
-                        flash(f'Successfully uploaded data for {company_name}. Note: AI scores could not be calculated - you can manually calculate scores from the company detail page.', 'warning')
-                except Exception as e:
-                    print(f"ERROR: Failed to calculate scores for {company_name}: {str(e)}")
-                    flash(f'Successfully uploaded data for {company_name}. Warning: Error calculating AI scores: {str(e)}. You can manually calculate scores from the company detail page.', 'warning')
+                # Automatically calculate AI scores for all sections in the background
+                logger.info("Queueing score calculation for %s...", company_name)
+                enqueue_score_calculation(company.id)
+                flash(f'Successfully uploaded data for {company_name}. AI scores are being calculated in the background.', 'success')
                 
                 return redirect(url_for('company_detail', company_id=company.id))
                 
@@ -626,29 +1070,35 @@ def getwell_plans(company_id):
             }
     
     # Get overall score
-    overall_score = get_overall_score(company_id)
+    overall_score = get_overall_score(company)
     overall_color = get_score_color(overall_score)
     
     return render_template('getwell_plans.html', company=company, plans=plans, section_scores=section_scores, overall_score=overall_score, overall_color=overall_color)
 
 @app.route('/calculate_scores/<int:company_id>')
 def calculate_scores(company_id):
-    """Calculate AI scores for all sections of a company"""
+    """Start calculating AI scores for all sections of a company"""
     company = Company.query.get_or_404(company_id)
     
-    try:
-        results = calculate_all_section_scores(company_id)
-        
-        if results:
-            flash(f'Successfully calculated scores for {len(results)} sections', 'success')
-        else:
-            flash('No scores could be calculated. Check if you have an OpenAI API key set.', 'warning')
-            
-    except Exception as e:
-        flash(f'Error calculating scores: {str(e)}', 'error')
+    # An explicit recalculation regenerates results even if the answers have not changed
+    enqueue_score_calculation(company.id, force=True)
+    flash('AI scores are being calculated in the background', 'success')
     
     return redirect(url_for('company_detail', company_id=company_id))
 
+@app.route('/job/<int:job_id>')
+def job_status(job_id):
+    """Report the progress of a background score calculation"""
+    job = CalculationJob.query.get_or_404(job_id)
+    
+    return jsonify({
+        'id': job.id,
+        'company_id': job.company_id,
+        'state': job.state,
+        'progress': job.progress,
+        'message': job.message
+    }), 202 if job.state in ('queued', 'running') else 200
+
 @app.route('/test_upload')
 def test_upload():
     """Simple test upload page"""
@@ -659,304 +1109,325 @@ def simple_test():
     """Very simple test upload page"""
     return send_file('simple_test.html')
 
-@app.route('/download_template')
-def download_template():
-    """Download CSV template"""
-    import csv
-    from io import StringIO
-    
-    # Create CSV template
-    output = StringIO()
+# Sections of the assessment template, referenced by index from TEMPLATE_QUESTIONS
+TEMPLATE_SECTIONS = (
+    'Section 1: Company Profile & Strategic Alignment',
+    'Section 2: AI Capabilities & Technical Maturity',
+    'Section 3: Government AI Integration & Contract Performance',
+    'Section 3: AI Adoption & Compliance in Healthcare Settings',
+    'Section 3: AI Integration & Financial Services Delivery',
+    'Section 4: Partnerships, Ecosystem & Industry Engagement',
+    'Section 5: AI Talent, Culture & Organizational Readiness',
+    'Section 6: Future Readiness & Differentiators',
+)
+
+# (section index, question) pairs in questionnaire order; answers are left blank
+TEMPLATE_QUESTIONS = (
+    # Section 1: Company Profile & Strategic Alignment
+    (0, 'Company Name'),
+    (0, 'Primary NAICS Codes (Only GovCon)'),
+    (0, 'Revenue'),
+    (0, 'Number of Employees'),
+    (0, 'Company Type: Basic, Financial Transaction Services, Healthcare, Technology & Government'),
+    (0, 'What is your company\'s overall mission and how does AI fit into it?'),
+    (0, 'Do you have a formal AI strategy or roadmap? If yes, please provide details or documents.'),
+    (0, 'Which of the following best describes your AI posture?'),
+    (0, 'Is there a designated AI lead, chief AI officer, or equivalent executive role? If yes, provide name/title.'),
+    (0, 'Who is responsible to AI strategy within your organization?'),
+    (0, 'What % of your internal Executive/Management Team meetings are discussing AI initiatives?'),
+    (0, 'What business outcomes are you aiming to achieve with AI over the next 12–24 months?'),
+    (0, 'Which of the following best describes your AI investment approach? Opportunistic, Strategic, Innovation-led, or Not yet defined'),
+    (0, 'In which areas does your leadership see the greatest risk or resistance to AI adoption?'),
+    (0, 'Get-Well Plan ‚ Section 1: Company Profile & Strategic Alignment'),
+
+    # Section 2: AI Capabilities & Technical Maturity
+    (1, 'Which of the following AI/ML capabilities does your company currently possess or deliver?'),
+    (1, 'Describe your internal AI development capability (e.g., number of AI/ML engineers, data scientists, tools used).'),
+    (1, 'Do you use open-source, proprietary, or government-provided models? Please specify examples.'),
+    (1, 'What development frameworks and toolchains are most commonly used?'),
+    (1, 'Do you have a formal AI/ML lifecycle management system in place?'),
+    (1, 'Do you conduct independent AI R&D? If yes, list notable efforts, funding sources, or publications.'),
+    (1, 'How frequently do you use AI tools in your day-to-day work?'),
+    (1, 'What types of AI tools do you personally use?'),
+    (1, 'For which tasks do you most commonly use AI? Include Use Case Summary, if Applicable'),
+    (1, 'How confident are you in using AI tools effectively?'),
+    (1, 'In which business functions is AI currently being used?'),
+    (1, 'How do you currently measure the impact or success of your AI solutions?'),
+    (1, 'Which stages of the AI lifecycle are you strongest in, and which need the most improvement?'),
+    (1, 'Do you follow any AI maturity model or framework to guide capability development?'),
+    (1, 'What AI capabilities do you consider essential to build or acquire in the next 12–24 months?'),
+    (1, 'Do you have a data infrastructure strategy?'),
+    (1, 'Get-Well Plan AI Section 2: AI Capabilities & Technical Maturity'),
+
+    # Section 3: Government AI Integration & Contract Performance (GovCon)
+    (2, 'On which contracts have you delivered AI-enabled capabilities?'),
+    (2, 'Are you currently on or pursuing any AI-specific IDIQs/BPAs?'),
+    (2, 'What security clearances or environments can your AI solutions operate within?'),
+    (2, 'Have you worked with government stakeholders on AI testing, evaluation, red teaming, or risk management?'),
+    (2, 'How do you ensure explainability, fairness, and ethical AI in federal applications?'),
+    (2, 'Are your AI tools or models accredited or certified for government use? If yes, list them.'),
+    (2, 'How does your company typically introduce AI capabilities to potential government clients?'),
+    (2, 'Do you use proof-of-concepts (POCs) or minimum viable products (MVPs) to demonstrate AI capabilities? Please provide examples.'),
+    (2, 'Are your customers inquiring about use of AI? If so, in what way?'),
+    (2, 'What risk of disruption does Generative AI pose?'),
+    (2, 'Are you partnered or subcontracted under any of the Big Primes for AI work?'),
+    (2, 'How does your AI capability align with current government priorities (e.g., autonomy, ISR, digital workforce)?'),
+    (2, 'Do you face procurement or regulatory barriers to AI adoption in government environments? If so, describe.'),
+    (2, 'Are you participating in any cross-agency AI initiatives, testbeds, or R&D challenges?'),
+    (2, 'What is your go-to-market strategy for AI solutions in the public sector?'),
+    (2, 'Get-Well Plan AI Section 3: Government AI Integration & Contract Performance'),
+
+    # Section 3: AI Adoption & Compliance in Healthcare Settings (Healthcare)
+    (3, 'On which healthcare initiatives or products have you delivered AI-enabled capabilities?'),
+    (3, 'Are you currently involved in or pursuing AI-specific collaborations with healthcare providers, payers, or research institutions?'),
+    (3, 'What compliance or regulatory environments can your AI solutions operate within? (e.g., HIPAA, FDA, ONC)'),
+    (3, 'Have you worked with clinical or regulatory stakeholders on AI validation, risk assessment, or model governance?'),
+    (3, 'How do you ensure explainability, fairness, and ethical AI in clinical or patient-facing applications?'),
+    (3, 'Are your AI tools or models accredited, validated, or cleared for use in healthcare? If yes, please list them.'),
+    (3, 'How does your company typically introduce AI capabilities to potential healthcare clients?'),
+    (3, 'Do you use clinical pilots, retrospective studies, or MVPs to demonstrate AI effectiveness? Please provide examples.'),
+    (3, 'Are your healthcare customers inquiring about AI? If so, in what context? (e.g., diagnostics, workflow automation, population health)'),
+    (3, 'What risk or opportunity does Generative AI pose in healthcare settings?'),
+    (3, 'Are you partnered with any major health systems, vendors, or academic institutions for AI initiatives?'),
+    (3, 'How are you addressing clinical validation and real-world evidence for AI in healthcare settings?'),
+    (3, 'What feedback have you received from clinical or operational users about your AI tools?'),
+    (3, 'Are your AI tools integrated with any EHRs, medical devices, or digital health platforms?'),
+    (3, 'What is your go-to-market strategy for AI solutions in the healthcare industry?'),
+    (3, 'Get-Well Plan AI Section 3: AI Adoption & Compliance in Healthcare Settings'),
+
+    # Section 3: AI Integration & Financial Services Delivery (Finance)
+    (4, 'On which financial products, platforms, or services have you delivered AI-enabled capabilities?'),
+    (4, 'Are you currently part of any AI-focused fintech accelerators, banking innovation labs, or regulatory sandboxes?'),
+    (4, 'What regulatory environments can your AI solutions operate within? (e.g., SEC, FINRA, GDPR, PCI DSS)'),
+    (4, 'Have you collaborated with internal risk, compliance, or audit teams on AI testing or governance?'),
+    (4, 'How do you ensure explainability, fairness, and ethical AI in financial decision-making systems?'),
+    (4, 'Are any of your AI models certified or validated by regulatory or industry bodies? If yes, list them.'),
+    (4, 'How does your company introduce AI capabilities to banking, insurance, or capital markets clients?'),
+    (4, 'Do you use proof-of-concepts (POCs) or MVPs to demonstrate AI capabilities in financial workflows? Please provide examples.'),
+    (4, 'Are your customers asking about AI adoption? In what areas? (e.g., fraud detection, credit scoring, trading, customer insights)'),
+    (4, 'What disruptive risks or opportunities do you associate with Generative AI in finance?'),
+    (4, 'Are you partnered with major financial institutions or consultancies for AI work?'),
+    (4, 'How is your company approaching model governance for AI in regulated financial workflows?'),
+    (4, 'Are you using AI for real-time risk management or compliance monitoring? If yes, how?'),
+    (4, 'What role do LLMs or Generative AI play in areas like customer communication, fraud detection, or compliance automation?'),
+    (4, 'What is your go-to-market strategy for AI offerings in the financial services sector?'),
+    (4, 'Get-Well Plan AI Section 3: AI Integration & Financial Services Delivery'),
+
+    # Section 4: Partnerships, Ecosystem & Industry Engagement
+    (5, 'Which AI hardware or cloud partners do you actively collaborate with?'),
+    (5, 'Are you a participant in any government or academic consortia on AI?'),
+    (5, 'Do you have partnerships with any academic institutions for AI research or talent pipeline?'),
+    (5, 'Do you collaborate with OpenAI, Anthropic, Cohere, or other foundation model companies?'),
+    (5, 'Get-Well Plan AI Section 4: Partnerships, Ecosystem & Industry Engagement'),
+
+    # Section 5: AI Talent, Culture & Organizational Readiness
+    (6, 'How many employees work in AI-related roles? Provide counts by function.'),
+    (6, 'Do you have AI-focused hiring goals or workforce development plans?'),
+    (6, 'Does your company offer AI training or upskilling programs internally?'),
+    (6, 'Do you have ethical guidelines or training in place for responsible AI use?'),
+    (6, 'Is AI incorporated into your company business development or proposal writing capabilities?'),
+    (6, 'How is AI being integrated into internal business functions such as HR, marketing, finance, and operations?'),
+    (6, 'Is AI used in any business development, sales, marketing, or proposal-related processes? If so, how?'),
+    (6, 'Is AI used in account planning or customer relationship strategies? If so, describe how it informs targeting, engagement, or pipeline development.'),
+    (6, 'Get-Well Plan AI Section 5: AI Talent, Culture & Organizational Readiness'),
+
+    # Section 6: Future Readiness & Differentiators
+    (7, 'What emerging AI capabilities are you investing in?'),
+    (7, 'What do you see as your company\'s competitive advantage in the AI market you serve?'),
+    (7, 'What challenges are you facing in scaling or deploying AI within your target market or client base?'),
+    (7, 'Where do you see your company\'s role in the AI ecosystem over the next 3–5 years?'),
+    (7, 'Are you planning on reducing your workforce and replace it with AI?'),
+    (7, 'Are there any current or upcoming AI initiatives you\'d like to highlight for strategic investment or collaboration?'),
+    (7, 'Get-Well Plan AI Section 6: Future Readiness & Differentiators'),
+)
+
+def build_template_csv():
+    """Build the CSV assessment template"""
+    output = io.StringIO()
     writer = csv.writer(output)
     
-    # Write header
+    # Write header and template rows
     writer.writerow(['Section', 'Question', 'Answer'])
+    writer.writerows((TEMPLATE_SECTIONS[i], question, '') for i, question in TEMPLATE_QUESTIONS)
     
-    # Write template rows based on the new questionnaire structure
-    template_data = [
-        # Section 1: Company Profile & Strategic Alignment
-        ['Section 1: Company Profile & Strategic Alignment', 'Company Name', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Primary NAICS Codes (Only GovCon)', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Revenue', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Number of Employees', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Company Type: Basic, Financial Transaction Services, Healthcare, Technology & Government', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'What is your company\'s overall mission and how does AI fit into it?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Do you have a formal AI strategy or roadmap? If yes, please provide details or documents.', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Which of the following best describes your AI posture?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Is there a designated AI lead, chief AI officer, or equivalent executive role? If yes, provide name/title.', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Who is responsible to AI strategy within your organization?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'What % of your internal Executive/Management Team meetings are discussing AI initiatives?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'What business outcomes are you aiming to achieve with AI over the next 12–24 months?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Which of the following best describes your AI investment approach? Opportunistic, Strategic, Innovation-led, or Not yet defined', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'In which areas does your leadership see the greatest risk or resistance to AI adoption?', ''],
-        ['Section 1: Company Profile & Strategic Alignment', 'Get-Well Plan ‚ Section 1: Company Profile & Strategic Alignment', ''],
-        
-        # Section 2: AI Capabilities & Technical Maturity
-        ['Section 2: AI Capabilities & Technical Maturity', 'Which of the following AI/ML capabilities does your company currently possess or deliver?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Describe your internal AI development capability (e.g., number of AI/ML engineers, data scientists, tools used).', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Do you use open-source, proprietary, or government-provided models? Please specify examples.', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'What development frameworks and toolchains are most commonly used?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Do you have a formal AI/ML lifecycle management system in place?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Do you conduct independent AI R&D? If yes, list notable efforts, funding sources, or publications.', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'How frequently do you use AI tools in your day-to-day work?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'What types of AI tools do you personally use?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'For which tasks do you most commonly use AI? Include Use Case Summary, if Applicable', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'How confident are you in using AI tools effectively?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'In which business functions is AI currently being used?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'How do you currently measure the impact or success of your AI solutions?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Which stages of the AI lifecycle are you strongest in, and which need the most improvement?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Do you follow any AI maturity model or framework to guide capability development?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'What AI capabilities do you consider essential to build or acquire in the next 12–24 months?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Do you have a data infrastructure strategy?', ''],
-        ['Section 2: AI Capabilities & Technical Maturity', 'Get-Well Plan AI Section 2: AI Capabilities & Technical Maturity', ''],
-        
-        # Section 3: Government AI Integration & Contract Performance (GovCon)
-        ['Section 3: Government AI Integration & Contract Performance', 'On which contracts have you delivered AI-enabled capabilities?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Are you currently on or pursuing any AI-specific IDIQs/BPAs?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'What security clearances or environments can your AI solutions operate within?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Have you worked with government stakeholders on AI testing, evaluation, red teaming, or risk management?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'How do you ensure explainability, fairness, and ethical AI in federal applications?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Are your AI tools or models accredited or certified for government use? If yes, list them.', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'How does your company typically introduce AI capabilities to potential government clients?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Do you use proof-of-concepts (POCs) or minimum viable products (MVPs) to demonstrate AI capabilities? Please provide examples.', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Are your customers inquiring about use of AI? If so, in what way?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'What risk of disruption does Generative AI pose?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Are you partnered or subcontracted under any of the Big Primes for AI work?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'How does your AI capability align with current government priorities (e.g., autonomy, ISR, digital workforce)?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Do you face procurement or regulatory barriers to AI adoption in government environments? If so, describe.', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Are you participating in any cross-agency AI initiatives, testbeds, or R&D challenges?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'What is your go-to-market strategy for AI solutions in the public sector?', ''],
-        ['Section 3: Government AI Integration & Contract Performance', 'Get-Well Plan AI Section 3: Government AI Integration & Contract Performance', ''],
-        
-        # Section 3: AI Adoption & Compliance in Healthcare Settings (Healthcare)
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'On which healthcare initiatives or products have you delivered AI-enabled capabilities?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Are you currently involved in or pursuing AI-specific collaborations with healthcare providers, payers, or research institutions?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'What compliance or regulatory environments can your AI solutions operate within? (e.g., HIPAA, FDA, ONC)', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Have you worked with clinical or regulatory stakeholders on AI validation, risk assessment, or model governance?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'How do you ensure explainability, fairness, and ethical AI in clinical or patient-facing applications?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Are your AI tools or models accredited, validated, or cleared for use in healthcare? If yes, please list them.', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'How does your company typically introduce AI capabilities to potential healthcare clients?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Do you use clinical pilots, retrospective studies, or MVPs to demonstrate AI effectiveness? Please provide examples.', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Are your healthcare customers inquiring about AI? If so, in what context? (e.g., diagnostics, workflow automation, population health)', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'What risk or opportunity does Generative AI pose in healthcare settings?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Are you partnered with any major health systems, vendors, or academic institutions for AI initiatives?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'How are you addressing clinical validation and real-world evidence for AI in healthcare settings?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'What feedback have you received from clinical or operational users about your AI tools?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Are your AI tools integrated with any EHRs, medical devices, or digital health platforms?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'What is your go-to-market strategy for AI solutions in the healthcare industry?', ''],
-        ['Section 3: AI Adoption & Compliance in Healthcare Settings', 'Get-Well Plan AI Section 3: AI Adoption & Compliance in Healthcare Settings', ''],
-        
-        # Section 3: AI Integration & Financial Services Delivery (Finance)
-        ['Section 3: AI Integration & Financial Services Delivery', 'On which financial products, platforms, or services have you delivered AI-enabled capabilities?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Are you currently part of any AI-focused fintech accelerators, banking innovation labs, or regulatory sandboxes?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'What regulatory environments can your AI solutions operate within? (e.g., SEC, FINRA, GDPR, PCI DSS)', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Have you collaborated with internal risk, compliance, or audit teams on AI testing or governance?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'How do you ensure explainability, fairness, and ethical AI in financial decision-making systems?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Are any of your AI models certified or validated by regulatory or industry bodies? If yes, list them.', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'How does your company introduce AI capabilities to banking, insurance, or capital markets clients?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Do you use proof-of-concepts (POCs) or MVPs to demonstrate AI capabilities in financial workflows? Please provide examples.', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Are your customers asking about AI adoption? In what areas? (e.g., fraud detection, credit scoring, trading, customer insights)', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'What disruptive risks or opportunities do you associate with Generative AI in finance?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Are you partnered with major financial institutions or consultancies for AI work?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'How is your company approaching model governance for AI in regulated financial workflows?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Are you using AI for real-time risk management or compliance monitoring? If yes, how?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'What role do LLMs or Generative AI play in areas like customer communication, fraud detection, or compliance automation?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'What is your go-to-market strategy for AI offerings in the financial services sector?', ''],
-        ['Section 3: AI Integration & Financial Services Delivery', 'Get-Well Plan AI Section 3: AI Integration & Financial Services Delivery', ''],
-        
-        # Section 4: Partnerships, Ecosystem & Industry Engagement
-        ['Section 4: Partnerships, Ecosystem & Industry Engagement', 'Which AI hardware or cloud partners do you actively collaborate with?', ''],
-        ['Section 4: Partnerships, Ecosystem & Industry Engagement', 'Are you a participant in any government or academic consortia on AI?', ''],
-        ['Section 4: Partnerships, Ecosystem & Industry Engagement', 'Do you have partnerships with any academic institutions for AI research or talent pipeline?', ''],
-        ['Section 4: Partnerships, Ecosystem & Industry Engagement', 'Do you collaborate with OpenAI, Anthropic, Cohere, or other foundation model companies?', ''],
-        ['Section 4: Partnerships, Ecosystem & Industry Engagement', 'Get-Well Plan AI Section 4: Partnerships, Ecosystem & Industry Engagement', ''],
-        
-        # Section 5: AI Talent, Culture & Organizational Readiness
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'How many employees work in AI-related roles? Provide counts by function.', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Do you have AI-focused hiring goals or workforce development plans?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Does your company offer AI training or upskilling programs internally?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Do you have ethical guidelines or training in place for responsible AI use?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Is AI incorporated into your company business development or proposal writing capabilities?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'How is AI being integrated into internal business functions such as HR, marketing, finance, and operations?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Is AI used in any business development, sales, marketing, or proposal-related processes? If so, how?', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Is AI used in account planning or customer relationship strategies? If so, describe how it informs targeting, engagement, or pipeline development.', ''],
-        ['Section 5: AI Talent, Culture & Organizational Readiness', 'Get-Well Plan AI Section 5: AI Talent, Culture & Organizational Readiness', ''],
-        
-        # Section 6: Future Readiness & Differentiators
-        ['Section 6: Future Readiness & Differentiators', 'What emerging AI capabilities are you investing in?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'What do you see as your company\'s competitive advantage in the AI market you serve?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'What challenges are you facing in scaling or deploying AI within your target market or client base?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'Where do you see your company\'s role in the AI ecosystem over the next 3–5 years?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'Are you planning on reducing your workforce and replace it with AI?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'Are there any current or upcoming AI initiatives you\'d like to highlight for strategic investment or collaboration?', ''],
-        ['Section 6: Future Readiness & Differentiators', 'Get-Well Plan AI Section 6: Future Readiness & Differentiators', '']
-    ]
-    
-    for row in template_data:
-        writer.writerow(row)
-    
-    output.seek(0)
-    
-    from flask import Response
+    return output.getvalue()
+
+# The template is static, so render it once at import and serve the same bytes
+TEMPLATE_CSV_BYTES = build_template_csv().encode('utf-8')
+
+@app.route('/download_template')
+def download_template():
+    """Download CSV template"""
     return Response(
-        output.getvalue(),
+        TEMPLATE_CSV_BYTES,
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment; filename=assessment_template.csv'}
     )
 
+# PDF report styles, built once and shared by every report
+REPORT_STYLES = getSampleStyleSheet()
+REPORT_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=REPORT_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30
+)
+REPORT_OVERALL_STYLE = ParagraphStyle(
+    'OverallScore',
+    parent=REPORT_STYLES['Normal'],
+    fontSize=16,
+    spaceAfter=20
+)
+SECTION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 14),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+# Characters not allowed in report download filenames
+SAFE_FILENAME_RE = re.compile(r'[^A-Za-z0-9._-]')
+
+# Get-Well Plan markdown rendering for the PDF report
+PLAN_LINE_RE = re.compile(
+    r'(?P<h3>### )|(?P<h4>#### )|(?P<bold>\*\*)|(?P<bold_bullet>- \*\*)|(?P<bullet>- )|(?P<hr>---)'
+)
+
+def plan_paragraph(line):
+    """Render a regular plan paragraph"""
+    return Paragraph(line, REPORT_STYLES['Normal'])
+
+def plan_bold(line):
+    """Render a **bold** plan line, or a regular paragraph if it is not closed"""
+    if not line.endswith('**'):
+        return plan_paragraph(line)
+    return Paragraph(f"<b>{line[2:-2].strip()}</b>", REPORT_STYLES['Normal'])
+
+def plan_bold_bullet(line):
+    """Render a bullet point with bold text"""
+    bullet_text = line[4:].strip()
+    if bullet_text.endswith('**'):
+        return Paragraph(f"• <b>{bullet_text[:-2]}</b>", REPORT_STYLES['Normal'])
+    return Paragraph(f"• {bullet_text}", REPORT_STYLES['Normal'])
+
+PLAN_LINE_HANDLERS = {
+    'h3': lambda line: Paragraph(f"<b>{line[4:].strip()}</b>", REPORT_STYLES['Heading3']),
+    'h4': lambda line: Paragraph(f"<b>{line[5:].strip()}</b>", REPORT_STYLES['Heading4']),
+    'bold': plan_bold,
+    'bold_bullet': plan_bold_bullet,
+    'bullet': lambda line: Paragraph(f"• {line[2:].strip()}", REPORT_STYLES['Normal']),
+    # Horizontal rule - add extra space
+    'hr': lambda line: Spacer(1, 12),
+}
+
+def render_plan_line(line):
+    """Render one stripped Get-Well Plan line as a PDF flowable"""
+    if not line:
+        return Spacer(1, 6)
+    
+    # Handle different markdown elements with one regex match per line
+    match = PLAN_LINE_RE.match(line)
+    if match:
+        return PLAN_LINE_HANDLERS[match.lastgroup](line)
+    return plan_paragraph(line)
+
 @app.route('/download_report/<int:company_id>')
 def download_report(company_id):
     """Download PDF report for a company"""
     company = Company.query.get_or_404(company_id)
     
-    # Get all assessment data
-    sections = get_company_sections(company_id) + ['Section 6: Future Readiness & Differentiators']
+    # Get all assessment data in one query and group it by section;
+    # Get-Well Plan rows are filtered out in SQL rather than loaded and skipped
+    sections = get_company_sections(company) + ['Section 6: Future Readiness & Differentiators']
     
-    section_data = {}
-    for section in sections:
-        assessments = Assessment.query.filter_by(company_id=company_id, section=section).all()
-        section_score = get_section_score(company_id, section)
-        section_data[section] = {
-            'assessments': assessments,
-            'score': section_score,
-            'color': get_score_color(section_score)
-        }
+    section_assessments = defaultdict(list)
+    report_assessments = Assessment.query.filter(
+        Assessment.company_id == company_id,
+        ~Assessment.question.contains('Get-Well Plan')
+    ).all()
+    for assessment in report_assessments:
+        section_assessments[assessment.section].append(assessment)
+    
+    section_scores = {section: average_assessment_score(section_assessments[section])
+                      for section in sections}
     
-    overall_score = get_overall_score(company_id)
+    # Reuse the in-memory section scores instead of re-aggregating them in SQL
+    overall_score = get_overall_score(company, section_scores)
     plans = GetWellPlan.query.filter_by(company_id=company_id).all()
     
     # Generate PDF report
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
+    safe_name = SAFE_FILENAME_RE.sub('_', company.name)
+    filename = f"report_{safe_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
-    filename = f"report_{company.name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    
-    doc = SimpleDocTemplate(filepath, pagesize=letter)
-    styles = getSampleStyleSheet()
+    # Build the PDF in memory instead of writing it to disk
+    pdf_buffer = io.BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter)
     story = []
+    append = story.append
+    extend = story.extend
     
     # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30
-    )
-    story.append(Paragraph(f"AI Assessment Report: {company.name}", title_style))
-    story.append(Spacer(1, 12))
+    append(Paragraph(f"AI Assessment Report: {company.name}", REPORT_TITLE_STYLE))
+    append(Spacer(1, 12))
     
     # Overall Score
-    overall_style = ParagraphStyle(
-        'OverallScore',
-        parent=styles['Normal'],
-        fontSize=16,
-        spaceAfter=20
-    )
     if overall_score is not None:
-        story.append(Paragraph(f"Overall AI Score: {overall_score:.1f}/10", overall_style))
+        append(Paragraph(f"Overall AI Score: {overall_score:.1f}/10", REPORT_OVERALL_STYLE))
     else:
-        story.append(Paragraph("Overall AI Score: N/A", overall_style))
-    story.append(Spacer(1, 12))
+        append(Paragraph("Overall AI Score: N/A", REPORT_OVERALL_STYLE))
+    append(Spacer(1, 12))
     
     # Section Scores Table
     section_data_table = [['Section', 'Score']]
     for section in sections:
-        score = section_data[section]['score']
+        score = section_scores[section]
         if score is not None:
             section_data_table.append([section, f"{score:.1f}/10"])
         else:
             section_data_table.append([section, "N/A"])
     
     section_table = Table(section_data_table, colWidths=[4*inch, 1*inch])
-    section_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 14),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(section_table)
-    story.append(Spacer(1, 20))
+    section_table.setStyle(SECTION_TABLE_STYLE)
+    append(section_table)
+    append(Spacer(1, 20))
     
     # Detailed Assessments
     for section in sections:
-        story.append(Paragraph(section, styles['Heading2']))
-        story.append(Spacer(1, 12))
+        append(Paragraph(section, REPORT_STYLES['Heading2']))
+        append(Spacer(1, 12))
         
-        for assessment in section_data[section]['assessments']:
-            if 'Get-Well Plan' not in assessment.question:
-                story.append(Paragraph(f"<b>Q: {assessment.question}</b>", styles['Normal']))
-                story.append(Paragraph(f"A: {assessment.answer}", styles['Normal']))
-                if assessment.score:
-                    story.append(Paragraph(f"Score: {assessment.score}/10", styles['Normal']))
-                story.append(Spacer(1, 6))
+        for assessment in section_assessments[section]:
+            extend((
+                Paragraph(f"<b>Q: {assessment.question}</b>", REPORT_STYLES['Normal']),
+                Paragraph(f"A: {assessment.answer}", REPORT_STYLES['Normal']),
+            ))
+            if assessment.score:
+                append(Paragraph(f"Score: {assessment.score}/10", REPORT_STYLES['Normal']))
+            append(Spacer(1, 6))
         
-        story.append(Spacer(1, 12))
+        append(Spacer(1, 12))
     
     # Get-Well Plans
     if plans:
-        story.append(Paragraph("Get-Well Plans", styles['Heading2']))
-        story.append(Spacer(1, 12))
+        append(Paragraph("Get-Well Plans", REPORT_STYLES['Heading2']))
+        append(Spacer(1, 12))
         
         for plan in plans:
-            story.append(Paragraph(f"<b>{plan.section}</b>", styles['Normal']))
-            
-            # Convert markdown to PDF formatting
-            plan_text = plan.plan_text
+            append(Paragraph(f"<b>{plan.section}</b>", REPORT_STYLES['Normal']))
             
-            # Split into lines and process each line
-            lines = plan_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    story.append(Spacer(1, 6))
-                    continue
-                
-                # Handle different markdown elements
-                if line.startswith('### '):
-                    # H3 heading
-                    heading_text = line[4:].strip()
-                    story.append(Paragraph(f"<b>{heading_text}</b>", styles['Heading3']))
-                elif line.startswith('#### '):
-                    # H4 heading
-                    heading_text = line[5:].strip()
-                    story.append(Paragraph(f"<b>{heading_text}</b>", styles['Heading4']))
-                elif line.startswith('**') and line.endswith('**'):
-                    # Bold text
-                    bold_text = line[2:-2].strip()
-                    story.append(Paragraph(f"<b>{bold_text}</b>", styles['Normal']))
-                elif line.startswith('- **'):
-                    # Bullet point with bold
-                    bullet_text = line[4:].strip()
-                    if bullet_text.endswith('**'):
-                        bullet_text = bullet_text[:-2]
-                        story.append(Paragraph(f"• <b>{bullet_text}</b>", styles['Normal']))
-                    else:
-                        story.append(Paragraph(f"• {bullet_text}", styles['Normal']))
-                elif line.startswith('- '):
-                    # Regular bullet point
-                    bullet_text = line[2:].strip()
-                    story.append(Paragraph(f"• {bullet_text}", styles['Normal']))
-                elif line.startswith('---'):
-                    # Horizontal rule - add extra space
-                    story.append(Spacer(1, 12))
-                else:
-                    # Regular paragraph
-                    if line:
-                        story.append(Paragraph(line, styles['Normal']))
+            # Convert markdown to PDF formatting, one flowable per line
+            extend(render_plan_line(line.strip()) for line in plan.plan_text.split('\n'))
             
-            story.append(Spacer(1, 12))
+            append(Spacer(1, 12))
     
     doc.build(story)
     
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    pdf_buffer.seek(0)
+    return send_file(pdf_buffer, mimetype='application/pdf', as_attachment=True, download_name=filename)
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -21,4 +21,6 @@ if __name__ == '__main__':
     print("🔧 Press Ctrl+C to stop the server")
     print("-" * 50)
     
-    app.run(debug=True, host='0.0.0.0', port=5010) 
\ No newline at end of file
+    # Serve with waitress; use `flask --app app run --debug` for auto-reload while developing
+    from waitress import serve
+    serve(app, host='0.0.0.0', port=5010, threads=int(os.getenv('WAITRESS_THREADS', 8)))